@@ -21,6 +21,79 @@ def sh(cmd, check=False):
         raise RuntimeError(f"cmd failed: {cmd}\n{err}")
     return p.returncode, out.strip(), err.strip()
 
+BOOM_PROFILE_NAME = "Rocky Linux 10"
+BOOM_PROFILE_VERSION = "10"
+BOOM_PROFILE_CMD = (
+    "boom profile create "
+    f"--name '{BOOM_PROFILE_NAME}' "
+    "--short-name rocky "
+    f"--os-version {BOOM_PROFILE_VERSION} "
+    f"--os-version-id {BOOM_PROFILE_VERSION} "
+    "--uname-pattern '.*el10.*x86_64' "
+    "--kernel-pattern '/vmlinuz-%{version}' "
+    "--initramfs-pattern '/initramfs-%{version}.img'"
+)
+
+def parse_snap_size(sz):
+    """Parse a snapshot size field for lvcreate.
+
+    Returns None for an empty or zero size (skip that LV), otherwise
+    (opt, arg, gib, pct, base): absolute sizes use -L and set gib,
+    percentages (20%, 20%ORIGIN, 10%VG, 50%FREE) use -l and set pct/base.
+    Raises ValueError for anything lvcreate would reject, and for %PVS,
+    whose space cannot be checked against the VG.
+    """
+    s = str(sz).strip().replace(',', '.')
+    if not s: return None
+    if re.fullmatch(r"[\d.]+%pvs", s, re.I):
+        raise ValueError(f"{s}: %PVS sizes are not supported")
+    m = re.fullmatch(r"(\d+(?:\.\d+)?)%(origin|vg|free)?", s, re.I)
+    if m:
+        pct = float(m.group(1))
+        base = (m.group(2) or "ORIGIN").upper()
+        if pct == 0: return None
+        if base != "ORIGIN" and pct > 100:
+            raise ValueError(f"{s}: more than 100% of {base}")
+        return ("-l", f"{m.group(1)}%{base}", None, pct, base)
+    m = re.fullmatch(r"(\d+(?:\.\d+)?)(?:([kmgt])(?:i?b)?|(b))?", s, re.I)
+    if m:
+        unit = (m.group(2) or m.group(3) or "m").lower()  # lvcreate's default unit is MiB
+        gib = float(m.group(1)) * {"b": 1 / 1024**3, "k": 1 / 1024**2, "m": 1 / 1024, "g": 1, "t": 1024}[unit]
+        if gib == 0: return None
+        return ("-L", f"{m.group(1)}{unit}", gib, None, None)
+    raise ValueError(f"unrecognised size '{sz}'")
+
+class PlanStep:
+    """One command of a workflow plan plus the steps that undo it.
+
+    Steps sharing a `batch` prefix (cmd == batch + " " + target) can be
+    coalesced into a single call, e.g. several `lvremove -y` targets.
+    `needs_osid` steps get `--profile <OsID>` appended at run time, once
+    the Boom profile created earlier in the same plan exists.
+    """
+    def __init__(self, desc, cmd, undo=None, batch=None, needs_osid=False):
+        self.desc = desc
+        self.cmd = cmd
+        self.undo = list(undo or [])
+        self.batch = batch
+        self.needs_osid = needs_osid
+
+def coalesce_steps(steps):
+    """Merge adjacent batchable steps into one call.
+
+    In practice this batches the rollback `lvremove -y` of every created
+    snapshot; lvcreate cannot take several snapshots per call.
+    """
+    out = []
+    for st in steps:
+        prev = out[-1] if out else None
+        if prev and st.batch and st.batch == prev.batch:
+            out[-1] = PlanStep(f"{prev.desc}; {st.desc}", prev.cmd + st.cmd[len(st.batch):],
+                               prev.undo + st.undo, st.batch, st.needs_osid)
+            continue
+        out.append(st)
+    return out
+
 def need_root():
     if os.geteuid() != 0:
         messagebox.showerror(APP_TITLE, "Please run as root: sudo python3 snapshot_manager.py")
@@ -88,6 +161,8 @@ class App(tk.Tk):
         ttk.Button(btns, text="Detect Layout", command=self.detect).pack(side="left")
         ttk.Button(btns, text="Create Snapshots", command=self.create_snaps).pack(side="left", padx=6)
         ttk.Button(btns, text="Add Boom Entry", command=self.add_boom).pack(side="left", padx=6)
+        ttk.Button(btns, text="Snapshots + Boom", command=self.snap_and_boom).pack(side="left", padx=6)
+        ttk.Button(btns, text="Plan (Dry Run)", command=self.dry_run).pack(side="left", padx=6)
         ttk.Button(btns, text="Merge (Rollback)", command=self.merge_snaps).pack(side="left", padx=6)
         ttk.Button(btns, text="Delete Snapshots", command=self.delete_snaps).pack(side="left", padx=6)
         ttk.Button(btns, text="Clean Boom Snapshots", command=self.clean_boom_snapshots_keep_newest).pack(side="left", padx=6)
@@ -114,13 +189,6 @@ class App(tk.Tk):
     def _snap_name(self, base):
         return f"{base}-{self.stamp.get()}"
 
-    def _to_g(self, sz):
-        s = str(sz).strip().lower()
-        if s.endswith('g'):
-            try: return float(s[:-1])
-            except: return None
-        return None
-
     # ------------- snapshot detection -------------
     def detect_snapshots(self):
         self.log("== Scanning for LVM snapshots ==")
@@ -303,221 +371,321 @@ class App(tk.Tk):
             self.set_buttons("normal")
 
     # ------------- Boom profile helpers -------------
-    def get_boom_osid(self):
-        """Return first Boom os_id using JSON (preferred), with --rows fallback."""
+    def list_boom_profiles(self):
+        """Return Boom profiles as dicts (osid, name, version, pattern), using
+        JSON (preferred) with a report-field fallback."""
         rc, out, err = sh("boom profile list --json")
         if rc == 0 and out.strip():
             try:
                 data = json.loads(out)
                 profiles = data.get("profiles") or data.get("profile") or []
                 if isinstance(profiles, dict): profiles = [profiles]
+                found = []
                 for p in profiles:
                     osid = p.get("os_id") or p.get("OsID") or ""
-                    if osid: return osid
+                    pat = p.get("uname_pattern") or p.get("UnamePattern") or p.get("OsUnamePattern") or ""
+                    if osid and pat:
+                        found.append({"osid": osid, "pattern": pat,
+                                      "name": p.get("os_name") or p.get("OsName") or "",
+                                      "version": str(p.get("os_version") or p.get("OsVersion") or "")})
+                # only trust JSON when it gave us usable fields
+                if found: return found
             except Exception as e:
                 self.log(f"Boom JSON parse error: {e}")
-        # fallback to rows
-        rc2, rows, _ = sh("boom profile list --rows")
-        if rc2 == 0 and rows.strip():
-            m = re.search(r'\bOsID\s+([0-9a-f]{7,})', rows, re.I)
-            if m: return m.group(1)
+        # fallback to report fields
+        found = []
+        rc2, rows, _ = sh("boom profile list -o osid,osname,osversion,unamepattern --separator '|'")
+        if rc2 == 0:
+            for line in rows.splitlines():
+                parts = [p.strip() for p in line.split('|', 3)]
+                if len(parts) != 4 or parts[0].lower() == 'osid':
+                    continue
+                osid, name, version, pat = parts
+                found.append({"osid": osid, "name": name, "version": version, "pattern": pat})
+        return found
+
+    def get_boom_osid(self, release=None, profiles=None):
+        """Return the Boom os_id whose uname pattern matches `release` (default: running kernel)."""
+        release = release or os.uname().release
+        for p in self.list_boom_profiles() if profiles is None else profiles:
+            try:
+                if p["pattern"] and re.search(p["pattern"], release): return p["osid"]
+            except re.error:
+                continue
         return ""
 
-    def ensure_boom_profile(self):
-        """Return a valid Boom OsID; create a minimal Rocky 10 profile if none exists."""
-        osid = self.get_boom_osid()
-        if osid: return osid
-
-        sh("mount | grep ' on /boot ' && mount -o remount,rw /boot")
-        prof_cmd = (
-            "boom profile create "
-            "--name 'Rocky Linux 10' "
-            "--short-name rocky "
-            "--os-version 10 "
-            "--os-version-id 10 "
-            "--uname-pattern '.*el10.*x86_64' "
-            "--kernel-pattern '/vmlinuz-%{version}' "
-            "--initramfs-pattern '/initramfs-%{version}.img'"
-        )
-        rc, out, err = sh(prof_cmd)
-        self.log(out or err or "Created Boom profile.")
-
-        # try extraction from creation output
-        m = re.search(r'os_id\s+([0-9a-f]{7,})', out, re.I)
-        if m: return m.group(1)
-
-        return self.get_boom_osid()
-
-    # ------------- snapshot creation -------------
-    def create_snaps(self):
-        vg = self.vg.get()
-        root_lv = self.root_lv.get()
-        var_lv  = self.var_lv.get()
-        home_lv = self.home_lv.get()
-
-        root_snap = self._snap_name("snap-pre")
-        var_snap  = self._snap_name("var-pre")
-        home_snap = self._snap_name("home-pre")
-
-        root_sz = self.root_sz.get()
-        var_sz  = self.var_sz.get()
-        home_sz = self.home_sz.get()
-
-        thin = self.detect()
+    def find_boom_profile(self, name=BOOM_PROFILE_NAME, version=BOOM_PROFILE_VERSION, profiles=None):
+        """Return the os_id of an existing profile with this name and version."""
+        for p in self.list_boom_profiles() if profiles is None else profiles:
+            if p["name"] == name and p["version"] == version: return p["osid"]
+        return ""
 
-        rc, vgs_out, _ = sh("vgs --noheadings -o vg_name,vfree")
-        self.log("== vgs ==\n" + vgs_out)
-        free_g = None
+    # ------------- workflow planner -------------
+    def take_inventory(self):
+        """One snapshot of LVM, Boom and /boot state for validating a plan."""
+        inv = {"vgs": {}, "lvs": {}, "thin": False, "boom": bool(shutil.which("boom")),
+               "osid": "", "own_osid": "", "boot_mounted": False, "boot_ro": False}
+        rc, out, err = sh("vgs --reportformat json --units g --nosuffix -o vg_name,vg_size,vg_free")
+        if rc == 0:
+            try:
+                for r in json.loads(out)["report"][0]["vg"]:
+                    inv["vgs"][r["vg_name"]] = {"size": float(r["vg_size"].replace(',', '.')),
+                                                "free": float(r["vg_free"].replace(',', '.'))}
+            except Exception as e:
+                self.log(f"JSON parse error: {e}")
+        else:
+            self.log(err or "vgs failed")
+        rc, out, err = sh("lvs --reportformat json --units g --nosuffix -o vg_name,lv_name,lv_attr,origin,lv_size")
+        if rc == 0:
+            try:
+                for r in json.loads(out)["report"][0]["lv"]:
+                    attr = r.get("lv_attr", "")
+                    inv["lvs"][(r["vg_name"], r["lv_name"])] = {
+                        "attr": attr, "origin": r.get("origin", ""),
+                        "size": float((r.get("lv_size") or "0").replace(',', '.'))}
+                    if attr.startswith("t"): inv["thin"] = True
+            except Exception as e:
+                self.log(f"JSON parse error: {e}")
+        else:
+            self.log(err or "lvs failed")
+        if inv["boom"]:
+            profiles = self.list_boom_profiles()
+            inv["osid"] = self.get_boom_osid(profiles=profiles)
+            inv["own_osid"] = self.find_boom_profile(profiles=profiles)
         try:
-            line = next(l for l in vgs_out.splitlines() if self.vg.get() in l)
-            free_str = line.split()[-1]
-            free_g = float(free_str.lower().rstrip('g').replace(',', '.')) if free_str.lower().endswith('g') else None
-        except Exception:
+            with open("/proc/mounts") as f:
+                for line in f:
+                    cols = line.split()
+                    if len(cols) >= 4 and cols[1] == "/boot":
+                        inv["boot_mounted"] = True
+                        inv["boot_ro"] = "ro" in cols[3].split(",")
+        except OSError:
             pass
+        return inv
 
-        need_g = sum(filter(None, [self._to_g(root_sz), self._to_g(var_sz), self._to_g(home_sz)]))
-        if free_g is not None and need_g is not None and free_g < need_g:
-            messagebox.showwarning(APP_TITLE, f"Not enough free VG space: need ~{need_g}G, have ~{free_g}G.\n"
-                                              f"Use 'Use Unallocated Space (grow PV)' or 'Add New PV (use free disk)'.")
-            return
-
-        self.set_buttons("disabled")
-        try:
-            self.log("Creating THIN snapshots..." if thin else "Creating CLASSIC snapshots... (needs free extents)")
-            cmds = []
-            if root_sz.lower() != "0g":
-                cmds.append(f"lvcreate -s -n {root_snap} -L {root_sz} /dev/{vg}/{root_lv}")
-            if var_sz.lower() != "0g":
-                cmds.append(f"lvcreate -s -n {var_snap} -L {var_sz} /dev/{vg}/{var_lv}")
-            if home_sz.lower() != "0g":
-                cmds.append(f"lvcreate -s -n {home_snap} -L {home_sz} /dev/{vg}/{home_lv}")
-
-            for c in cmds:
-                rc, out, err = sh(c)
-                if rc != 0:
-                    self.log(f"ERR: {c}\n{err}")
-                    messagebox.showerror(APP_TITLE, f"Snapshot failed:\n{err}")
-                    return
-                self.log(out or f"OK: {c}")
+    def plan_workflow(self, workflow):
+        """Turn a workflow ("snapshots", "boom") into checked, coalesced steps.
 
-            # Mount test for root snapshot: XFS=nouuid, ext4=noload, with fallback
-            rc, fstype, _ = sh(f"lsblk -no FSTYPE /dev/{vg}/{root_snap}")
-            fstype = fstype.strip().lower()
-            opt = "ro,nouuid" if fstype == "xfs" else "ro,noload"
-            sh(f"mkdir -p /mnt/{root_snap}")
-            rc, out, err = sh(f"mount -o {opt} /dev/{vg}/{root_snap} /mnt/{root_snap}")
-            if rc != 0:
-                alt = "ro,noload" if opt == "ro,nouuid" else "ro,nouuid"
-                rc2, out2, err2 = sh(f"mount -o {alt} /dev/{vg}/{root_snap} /mnt/{root_snap}")
-                if rc2 == 0:
-                    sh(f"umount /mnt/{root_snap}")
-                    self.log(f"Mounted {root_snap} read-only successfully (fallback {alt}).")
-                else:
-                    self.log(f"(Note) Could not mount test {root_snap}:\n{err}\n{err2}")
-            else:
-                sh(f"umount /mnt/{root_snap}")
-                self.log(f"Mounted {root_snap} read-only successfully.")
-
-            self.show_lvm()
-            self.log("Snapshots created. You can now add a Boom entry (root).")
-        finally:
-            self.set_buttons("normal")
-
-    # ------------- Boom entry -------------
-    def add_boom(self):
+        Everything is validated against a single inventory up front, so a
+        plan with errors never touches the system.
+        """
         vg = self.vg.get()
         root_snap = self._snap_name("snap-pre")
-
-        # ensure /boot writable
-        sh("mount | grep ' on /boot ' && mount -o remount,rw /boot")
-
-        # kernel artifacts
-        _, ver, _ = sh("uname -r", check=True)
-        ver = ver.strip()
-        linux = f"/vmlinuz-{ver}"
-        initrd = f"/initramfs-{ver}.img"
-
-        # Detect filesystem type of the root snapshot
-        rc_fs, fstype, err_fs = sh(f"lsblk -no FSTYPE /dev/{vg}/{root_snap}")
-        if rc_fs != 0:
-            self.log(f"Warning: Could not detect filesystem type for {root_snap}: {err_fs}")
-            fstype = ""
-        else:
-            fstype = fstype.strip().lower()
-            self.log(f"Detected filesystem type for {root_snap}: {fstype}")
-
-        extra = (self.extra_opts.get() or "").strip()
-
-        # detect fs type, choose rootflag
-        if fstype == "xfs":
-            rootflag = "nouuid"
-        elif fstype == "ext4":
-            rootflag = "noload"
-        else:
-            rootflag = None
-
-        opts_list = []
-        if rootflag:
-            opts_list.append(f"rootflags={rootflag}")
-        if extra:
-            opts_list.append(extra)
-
-        add_opts = " ".join(opts_list)
-        self.log(f"Final extra options for Boom entry: '{add_opts}'")
-
-        # Base create command (let Boom/OS profile supply normal kernelopts)
-        base_cmd = (
-            f"boom entry create "
-            f"--linux '{linux}' "
-            f"--initrd '{initrd}' "
-            f"--root-lv {vg}/{root_snap} "
-            f"--title 'Rollback: {self.stamp.get()} (root snapshot)'"
-        )
-        cmd = base_cmd + (f" --add-opts '{add_opts}'" if add_opts else "")
-
-        rc, out, err = sh(cmd)
-        if rc == 0:
-            self.log(out or "Boom entry created.")
-            rc2, out2, _ = sh("boom entry list --rows")
-            self.log(out2)
-            return
-
-        # If Boom demands a profile, ensure one exists and retry with --profile
-        combined = (err or "") + (out or "")
-        if "requires --profile" in combined.lower():
-            self.log("Boom requires a profile; ensuring a minimal Rocky 10 profile exists...")
-            osid = self.ensure_boom_profile()
-            if not osid:
-                self.log("Failed to obtain a Boom OsID.")
-                messagebox.showerror(APP_TITLE, "Could not obtain a Boom OsID.")
-                return
-
-            cmd2 = (
-                f"boom entry create --profile '{osid}' "
+        inv = self.take_inventory()
+        steps, errors, notes = [], [], []
+        planned = set()  # snapshot names this plan creates
+        space_short = False
+
+        if vg not in inv["vgs"]:
+            errors.append(f"VG '{vg}' not found.")
+
+        if "snapshots" in workflow:
+            vg_info = inv["vgs"].get(vg, {"size": 0.0, "free": 0.0})
+            free_g = vg_info["free"]
+            need_g = 0.0
+            for base, lv_var, sz_var in [("snap-pre", self.root_lv, self.root_sz),
+                                         ("var-pre", self.var_lv, self.var_sz),
+                                         ("home-pre", self.home_lv, self.home_sz)]:
+                origin, snap = lv_var.get(), self._snap_name(base)
+                try:
+                    size = parse_snap_size(sz_var.get())
+                except ValueError as e:
+                    errors.append(f"{snap}: {e}"); continue
+                if size is None: continue
+                lv = inv["lvs"].get((vg, origin))
+                if lv is None:
+                    errors.append(f"Origin {vg}/{origin} does not exist."); continue
+                if lv["attr"][:1].lower() == "s":
+                    errors.append(f"Origin {vg}/{origin} is itself a snapshot."); continue
+                if (vg, snap) in inv["lvs"] or snap in planned:
+                    errors.append(f"{vg}/{snap} already exists (change STAMP)."); continue
+                opt, arg, gib, pct, pbase = size
+                if gib is None:
+                    left_g = max(free_g - need_g, 0)
+                    gib = pct / 100 * {"ORIGIN": lv["size"], "FREE": left_g, "VG": vg_info["size"]}[pbase]
+                    if pbase == "FREE" and gib <= 0:
+                        errors.append(f"{vg}/{snap}: {arg} leaves 0 extents (no free space left)."); continue
+                need_g += gib
+                planned.add(snap)
+                steps.append(PlanStep(f"snapshot {origin} → {snap} (~{gib:.1f}G)",
+                                      f"lvcreate -s -n {snap} {opt} {arg} /dev/{vg}/{origin}",
+                                      [PlanStep(f"remove {snap}", f"lvremove -y {vg}/{snap}", batch="lvremove -y")]))
+            if need_g > free_g:
+                space_short = True
+                errors.append(f"Not enough free VG space: need ~{need_g:.1f}G, have ~{free_g:.1f}G. "
+                              f"Use 'Use Unallocated Space (grow PV)' or 'Add New PV (use free disk)'.")
+            notes.append("THIN pool present." if inv["thin"] else "CLASSIC snapshots (needs free extents).")
+
+        if "boom" in workflow:
+            if not inv["boom"]:
+                errors.append("Boom is not installed; use 'Install Boom' first.")
+            if root_snap not in planned and (vg, root_snap) not in inv["lvs"]:
+                errors.append(f"Root snapshot {vg}/{root_snap} neither exists nor is planned.")
+
+            if inv["boot_ro"]:
+                steps.append(PlanStep("remount /boot read-write", "mount -o remount,rw /boot",
+                                      [PlanStep("remount /boot read-only", "mount -o remount,ro /boot")]))
+            elif not inv["boot_mounted"] and not os.access("/boot", os.W_OK):
+                errors.append("/boot is not writable.")
+
+            new_profile = inv["boom"] and not inv["osid"] and not inv["own_osid"]
+            if inv["boom"] and not inv["osid"] and inv["own_osid"]:
+                notes.append(f"No Boom profile matches {os.uname().release}; reusing existing "
+                             f"'{BOOM_PROFILE_NAME}' profile {inv['own_osid']}.")
+            elif new_profile:
+                notes.append(f"No Boom profile matches {os.uname().release}; a minimal Rocky 10 profile will be created.")
+                steps.append(PlanStep("create Boom profile", BOOM_PROFILE_CMD,
+                                      [PlanStep("delete Boom profile", "boom profile delete", needs_osid=True)]))
+
+            ver = os.uname().release
+            linux, initrd = f"/vmlinuz-{ver}", f"/initramfs-{ver}.img"
+            for path in (linux, initrd):
+                if not os.path.exists(f"/boot{path}"):
+                    errors.append(f"Kernel artifact /boot{path} is missing.")
+
+            # snapshot may not exist yet; its filesystem is the origin's
+            dev = root_snap if (vg, root_snap) in inv["lvs"] else self.root_lv.get()
+            _, fstype, _ = sh(f"lsblk -no FSTYPE /dev/{vg}/{dev}")
+            rootflag = {"xfs": "nouuid", "ext4": "noload"}.get(fstype.strip().lower())
+            extra = (self.extra_opts.get() or "").strip()
+            add_opts = " ".join(filter(None, [f"rootflags={rootflag}" if rootflag else "", extra]))
+
+            cmd = (
+                f"boom entry create "
                 f"--linux '{linux}' "
                 f"--initrd '{initrd}' "
                 f"--root-lv {vg}/{root_snap} "
                 f"--title 'Rollback: {self.stamp.get()} (root snapshot)'"
             )
             if add_opts:
-                cmd2 += f" --add-opts '{add_opts}'"
+                cmd += f" --add-opts '{add_opts}'"
+            # only pin --profile when no profile matches the kernel; otherwise
+            # Boom picks the matching one itself
+            if not inv["osid"] and inv["own_osid"]:
+                cmd += f" --profile '{inv['own_osid']}'"
+            steps.append(PlanStep(f"Boom entry for {root_snap}", cmd,
+                                  [PlanStep(f"delete Boom entry for {root_snap}",
+                                            f"boom entry delete --root-lv {vg}/{root_snap}")],
+                                  needs_osid=new_profile))
+
+        return {"workflow": workflow, "steps": coalesce_steps(steps), "errors": errors,
+                "notes": notes, "space_short": space_short}
+
+    def show_plan(self, plan):
+        self.log(f"== Plan: {' + '.join(plan['workflow'])} ==")
+        for i, st in enumerate(plan["steps"], 1):
+            self.log(f"  {i}. {st.desc}\n     $ {st.cmd}" + (" --profile <new OsID>" if st.needs_osid else ""))
+            for u in st.undo:
+                self.log(f"     undo: {u.cmd}" + (" --profile <new OsID>" if u.needs_osid else ""))
+        for n in plan["notes"]:
+            self.log(f"  * {n}")
+        for e in plan["errors"]:
+            self.log(f"  ERR: {e}")
+        if plan["errors"]:
+            self.log(f"Plan has {len(plan['errors'])} problem(s); nothing will be run.")
+        else:
+            self.log(f"Plan OK: {len(plan['steps'])} step(s).")
 
-            rc2, out2, err2 = sh(cmd2)
-            if rc2 != 0:
-                self.log(f"ERR: {cmd2}\n{err2 or out2}")
-                messagebox.showerror(APP_TITLE, f"Boom entry failed after profile creation:\n{err2 or out2}")
-                return
+    def run_plan(self, plan):
+        """Execute a validated plan; on failure roll back completed steps."""
+        self.show_plan(plan)
+        if plan["errors"]:
+            messagebox.showwarning(APP_TITLE, "Plan rejected:\n" + "\n".join(plan["errors"]))
+            return False
+        self.set_buttons("disabled")
+        done, osid = [], ""
+        try:
+            for i, st in enumerate(plan["steps"], 1):
+                cmd, rc, out, err = st.cmd, None, "", ""
+                if st.needs_osid:
+                    if osid: cmd += f" --profile '{osid}'"
+                    else: rc, err = 1, "Could not obtain a Boom OsID."
+                if rc is None:
+                    rc, out, err = sh(cmd)
+                if rc != 0:
+                    self.log(f"ERR: {cmd}\n{err or out}")
+                    self.rollback(done, osid)
+                    messagebox.showerror(APP_TITLE, f"Step {i} ({st.desc}) failed:\n{err or out}\n\n"
+                                                    f"Rolled back {len(done)} completed step(s).")
+                    return False
+                self.log(out or f"OK: {cmd}")
+                done.append(st)
+                if not osid and any(u.needs_osid for u in st.undo):
+                    # this step created the profile; resolve its OsID now
+                    m = re.search(r'os_id\s+([0-9a-f]{7,})', out, re.I)
+                    osid = m.group(1) if m else self.find_boom_profile()
+            return True
+        finally:
+            self.set_buttons("normal")
 
-            self.log(out2 or "Boom entry created (after creating profile).")
-            rc3, out3, _ = sh("boom entry list --rows")
-            self.log(out3)
-            return
+    def rollback(self, done, osid=""):
+        undo = [u for st in reversed(done) for u in st.undo]
+        if not undo:
+            self.log("Nothing to roll back."); return
+        self.log(f"== Rolling back {len(done)} completed step(s) ==")
+        for st in coalesce_steps(undo):
+            cmd = st.cmd
+            if st.needs_osid:
+                if not osid:
+                    self.log(f"Cannot undo ({st.desc}): Boom OsID unknown."); continue
+                cmd += f" --profile '{osid}'"
+            rc, out, err = sh(cmd)
+            if rc == 0: self.log(out or f"Undone: {st.desc}")
+            else: self.log(f"Failed to undo ({st.desc}): {err or out}")
+
+    def dry_run(self):
+        """Preview the next workflow: Boom entry only once the root snapshot exists."""
+        rc, _, _ = sh(f"lvs /dev/{self.vg.get()}/{self._snap_name('snap-pre')}")
+        self.show_plan(self.plan_workflow(["boom"] if rc == 0 else ["snapshots", "boom"]))
+
+    def run_snapshot_plan(self, workflow):
+        """run_plan for workflows that create snapshots; hint at growing the VG when short."""
+        plan = self.plan_workflow(workflow)
+        if self.run_plan(plan): return True
+        if plan["space_short"]:
+            self.detect_possible_unallocated_after_pv()
+        return False
 
-        # other error
-        self.log(f"ERR: {cmd}\n{err or out}")
-        messagebox.showerror(APP_TITLE, f"Boom entry failed:\n{err or out}")
+    # ------------- snapshot creation -------------
+    def mount_test(self, vg, root_snap):
+        # Mount test for root snapshot: XFS=nouuid, ext4=noload, with fallback
+        rc, fstype, _ = sh(f"lsblk -no FSTYPE /dev/{vg}/{root_snap}")
+        fstype = fstype.strip().lower()
+        opt = "ro,nouuid" if fstype == "xfs" else "ro,noload"
+        sh(f"mkdir -p /mnt/{root_snap}")
+        rc, out, err = sh(f"mount -o {opt} /dev/{vg}/{root_snap} /mnt/{root_snap}")
+        if rc != 0:
+            alt = "ro,noload" if opt == "ro,nouuid" else "ro,nouuid"
+            rc2, out2, err2 = sh(f"mount -o {alt} /dev/{vg}/{root_snap} /mnt/{root_snap}")
+            if rc2 == 0:
+                sh(f"umount /mnt/{root_snap}")
+                self.log(f"Mounted {root_snap} read-only successfully (fallback {alt}).")
+            else:
+                self.log(f"(Note) Could not mount test {root_snap}:\n{err}\n{err2}")
+        else:
+            sh(f"umount /mnt/{root_snap}")
+            self.log(f"Mounted {root_snap} read-only successfully.")
 
+    def create_snaps(self):
+        if not self.run_snapshot_plan(["snapshots"]): return
+        if parse_snap_size(self.root_sz.get()):  # already validated by the plan
+            self.mount_test(self.vg.get(), self._snap_name("snap-pre"))
+        self.show_lvm()
+        self.log("Snapshots created. You can now add a Boom entry (root).")
 
+    # ------------- Boom entry -------------
+    def add_boom(self):
+        if not self.run_plan(self.plan_workflow(["boom"])): return
+        rc, out, _ = sh("boom entry list --rows")
+        self.log(out)
+
+    def snap_and_boom(self):
+        """Snapshots + Boom entry as one plan; a Boom failure removes the snapshots."""
+        if not self.run_snapshot_plan(["snapshots", "boom"]): return
+        self.mount_test(self.vg.get(), self._snap_name("snap-pre"))
+        rc, out, _ = sh("boom entry list --rows")
+        self.log(out)
+        self.show_lvm()
 
     def install_boom(self):
         self.log("Installing Boom...")
@@ -0,0 +1,167 @@
+import json, os, sys, unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import snapshot_manager
+from snapshot_manager import App, PlanStep, coalesce_steps, parse_snap_size
+
+
+class ParseSnapSizeTest(unittest.TestCase):
+    def test_absolute_sizes(self):
+        self.assertEqual(parse_snap_size("20G"), ("-L", "20g", 20.0, None, None))
+        self.assertEqual(parse_snap_size("20GiB"), ("-L", "20g", 20.0, None, None))
+        self.assertEqual(parse_snap_size("1,5t"), ("-L", "1.5t", 1536.0, None, None))
+        self.assertEqual(parse_snap_size("512"), ("-L", "512m", 0.5, None, None))
+        self.assertEqual(parse_snap_size("20B")[:3], ("-L", "20b", 20 / 1024**3))
+
+    def test_percent_sizes(self):
+        self.assertEqual(parse_snap_size("20%"), ("-l", "20%ORIGIN", None, 20.0, "ORIGIN"))
+        self.assertEqual(parse_snap_size("10%vg"), ("-l", "10%VG", None, 10.0, "VG"))
+        self.assertEqual(parse_snap_size("100%FREE"), ("-l", "100%FREE", None, 100.0, "FREE"))
+        self.assertEqual(parse_snap_size("150%ORIGIN")[1], "150%ORIGIN")
+
+    def test_zero_or_empty_means_skip(self):
+        for s in ["", " ", "0G", "0", "0%FREE"]:
+            self.assertIsNone(parse_snap_size(s), s)
+
+    def test_rejects_invalid(self):
+        for s in ["abc", "20X", "150%VG", "-5G", "20ib", "10%PVS"]:
+            with self.assertRaises(ValueError, msg=s):
+                parse_snap_size(s)
+
+
+class CoalesceStepsTest(unittest.TestCase):
+    def test_merges_adjacent_batch(self):
+        steps = [PlanStep("a", "lvremove -y rl/a", batch="lvremove -y"),
+                 PlanStep("b", "lvremove -y rl/b", batch="lvremove -y"),
+                 PlanStep("ro", "mount -o remount,ro /boot"),
+                 PlanStep("c", "lvremove -y rl/c", batch="lvremove -y")]
+        out = coalesce_steps(steps)
+        self.assertEqual([s.cmd for s in out],
+                         ["lvremove -y rl/a rl/b", "mount -o remount,ro /boot", "lvremove -y rl/c"])
+        self.assertEqual(out[0].desc, "a; b")
+
+    def test_keeps_unbatched_and_undo(self):
+        undo = [PlanStep("rm", "lvremove -y rl/s", batch="lvremove -y")]
+        steps = [PlanStep("x", "lvcreate -s -n s -L 1g /dev/rl/root", undo),
+                 PlanStep("y", "lvcreate -s -n t -L 1g /dev/rl/var", undo)]
+        out = coalesce_steps(steps)
+        self.assertEqual(len(out), 2)
+        self.assertEqual(out[0].undo[0].cmd, "lvremove -y rl/s")
+
+
+class Var:
+    def __init__(self, value): self.value = value
+    def get(self): return self.value
+
+
+class FakeApp:
+    """Just enough of App to plan and run workflows without a Tk display."""
+    plan_workflow = App.plan_workflow
+    show_plan = App.show_plan
+    run_plan = App.run_plan
+    rollback = App.rollback
+    list_boom_profiles = App.list_boom_profiles
+    get_boom_osid = App.get_boom_osid
+    find_boom_profile = App.find_boom_profile
+    _snap_name = App._snap_name
+
+    def __init__(self, inv, sizes=("20G", "10G", "0G")):
+        self.inv = inv
+        self.vg, self.stamp, self.extra_opts = Var("rl"), Var("X"), Var("")
+        self.root_lv, self.var_lv, self.home_lv = Var("root"), Var("var"), Var("home")
+        self.root_sz, self.var_sz, self.home_sz = (Var(s) for s in sizes)
+        self.logged = []
+
+    def take_inventory(self): return self.inv
+    def log(self, s): self.logged.append(s)
+    def set_buttons(self, state): pass
+
+
+def inventory(free=60.0, lvs=("root", "var"), osid="el10", own_osid="", boot_ro=False):
+    return {"vgs": {"rl": {"size": 100.0, "free": free}},
+            "lvs": {("rl", n): {"attr": "owi-ao", "origin": "", "size": 50.0} for n in lvs},
+            "thin": False, "boom": True, "osid": osid, "own_osid": own_osid,
+            "boot_mounted": True, "boot_ro": boot_ro}
+
+
+class PlannerTest(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.replies = {}
+        def sh(cmd, check=False):
+            self.calls.append(cmd)
+            for prefix, reply in self.replies.items():
+                if cmd.startswith(prefix): return reply
+            return 0, "xfs" if cmd.startswith("lsblk") else "", ""
+        for p in [mock.patch.object(snapshot_manager, "sh", sh),
+                  mock.patch.object(snapshot_manager.os.path, "exists", lambda p: True),
+                  mock.patch.object(snapshot_manager, "messagebox")]:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def commands(self, prefix):
+        return [c for c in self.calls if c.startswith(prefix)]
+
+    def test_rejects_missing_origin(self):
+        app = FakeApp(inventory(lvs=("root",)))
+        plan = app.plan_workflow(["snapshots"])
+        self.assertIn("Origin rl/var does not exist.", plan["errors"])
+        self.assertFalse(app.run_plan(plan))
+        self.assertEqual(self.commands("lvcreate"), [])
+
+    def test_rejects_name_collision(self):
+        plan = FakeApp(inventory(lvs=("root", "var", "snap-pre-X"))).plan_workflow(["snapshots"])
+        self.assertIn("rl/snap-pre-X already exists (change STAMP).", plan["errors"])
+
+    def test_rejects_overcommitted_free_percentage(self):
+        plan = FakeApp(inventory(free=10.0), ("20G", "100%FREE", "0G")).plan_workflow(["snapshots"])
+        self.assertTrue(plan["space_short"])
+        self.assertTrue(any("100%FREE leaves 0 extents" in e for e in plan["errors"]))
+        self.assertTrue(any(e.startswith("Not enough free VG space: need ~20.0G, have ~10.0G")
+                            for e in plan["errors"]))
+
+    def test_free_percentage_uses_remaining_space(self):
+        plan = FakeApp(inventory(free=60.0), ("20G", "50%FREE", "0G")).plan_workflow(["snapshots"])
+        self.assertEqual(plan["errors"], [])
+        self.assertIn("(~20.0G)", plan["steps"][1].desc)
+
+    def test_rejects_boom_without_root_snapshot(self):
+        plan = FakeApp(inventory()).plan_workflow(["boom"])
+        self.assertIn("Root snapshot rl/snap-pre-X neither exists nor is planned.", plan["errors"])
+
+    def test_boom_uses_matching_profile_implicitly(self):
+        plan = FakeApp(inventory()).plan_workflow(["snapshots", "boom"])
+        self.assertEqual(plan["errors"], [])
+        entry = plan["steps"][-1]
+        self.assertNotIn("--profile", entry.cmd)
+        self.assertFalse(entry.needs_osid)
+        self.assertFalse(any(st.cmd.startswith("boom profile create") for st in plan["steps"]))
+
+    def test_boom_reuses_existing_own_profile(self):
+        plan = FakeApp(inventory(osid="", own_osid="abc1234")).plan_workflow(["snapshots", "boom"])
+        self.assertFalse(any(st.cmd.startswith("boom profile create") for st in plan["steps"]))
+        self.assertTrue(plan["steps"][-1].cmd.endswith("--profile 'abc1234'"))
+
+    def test_failed_step_rolls_back_in_reverse(self):
+        self.replies = {"boom profile create": (0, "Created profile with os_id 1234abcd:", ""),
+                        "boom entry create": (1, "", "boom failed")}
+        app = FakeApp(inventory(osid="", boot_ro=True))
+        self.assertFalse(app.run_plan(app.plan_workflow(["snapshots", "boom"])))
+        self.assertEqual(self.commands("boom entry create")[0][-20:], "--profile '1234abcd'")
+        start = self.calls.index(self.commands("boom entry create")[0]) + 1
+        self.assertEqual(self.calls[start:], ["boom profile delete --profile '1234abcd'",
+                                              "mount -o remount,ro /boot",
+                                              "lvremove -y rl/var-pre-X rl/snap-pre-X"])
+
+    def test_profile_list_falls_back_when_json_lacks_fields(self):
+        self.replies = {"boom profile list --json": (0, json.dumps({"profiles": [{"id": "x"}]}), ""),
+                        "boom profile list -o": (0, "OsID|OsName|OsVersion|UnamePattern\n"
+                                                    "abc1234|Rocky Linux 10|10|el10", "")}
+        app = FakeApp(inventory())
+        self.assertEqual(app.get_boom_osid("6.12.0-55.el10.x86_64"), "abc1234")
+        self.assertEqual(app.find_boom_profile(), "abc1234")
+
+
+if __name__ == "__main__":
+    unittest.main()